@@ -3,14 +3,23 @@ Dataroma Portfolio Scraper
 - 시작 페이지에서 모든 구루(Portfolio Manager) 링크를 수집
 - 각 구루의 상세 페이지에서 Q4 2025 데이터만 필터링
 - Recent Activity가 Buy 또는 Add인 종목만 추출
-- 결과를 dataroma_q4_2025_buys.xlsx 엑셀 파일로 저장
+- 결과를 dataroma_q4_2025_buys.csv 파일로 저장 (--excel 옵션 시 엑셀도 저장)
 """
 
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
+import argparse
+import asyncio
+import functools
+import hashlib
+import os
 import time
-import random
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+import aiohttp
+from lxml import html as lxml_html
+import pandas as pd
 import re
 import sys
 
@@ -25,113 +34,226 @@ HEADERS = {
     ),
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
     "Accept-Language": "en-US,en;q=0.9",
+    # 압축 응답 + 커넥션 재사용 (TCP/TLS 재협상 방지)
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
     "Referer": "https://www.dataroma.com/m/home.php",
 }
 
-OUTPUT_FILE = "dataroma_q4_2025_buys.xlsx"
+# CSV가 기본 출력 (엑셀 직렬화보다 수십 배 빠름), 엑셀은 --excel 옵션으로 추가 생성
+OUTPUT_CSV = "dataroma_q4_2025_buys.csv"
+OUTPUT_XLSX = "dataroma_q4_2025_buys.xlsx"
+
+# 결과는 처음부터 컬럼 단위(dict of lists)로 누적
+# -> DataFrame 생성 시 행 단위 dict의 컬럼 추론/전치 비용이 없음
+RESULT_COLUMNS = ("Manager", "Stock", "Ticker", "Recent Activity",
+                  "Portfolio %", "Reported Price")
+
+
+def new_result_columns() -> dict[str, list]:
+    """빈 결과 컬럼 dict를 만든다."""
+    return {c: [] for c in RESULT_COLUMNS}
+
+
+# --raw-excel용 XLSX 컨테이너 고정 XML 파트 (zip of XML이 곧 .xlsx)
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType='
+    '"application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType='
+    '"application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType='
+    '"application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    "</Types>"
+)
+_XLSX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/'
+    'officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    "</Relationships>"
+)
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Q4 2025 Buys" sheetId="1" r:id="rId1"/></sheets>'
+    "</workbook>"
+)
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/'
+    'officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    "</Relationships>"
+)
+
+
+def _write_xlsx_raw(columns: dict[str, list], path: str) -> None:
+    """엑셀 라이브러리 없이 XLSX 컨테이너(XML 파트들의 zip)를 직접 쓴다.
+
+    모든 셀을 inline string으로 쓰는 단순한 형식이라 셀 단위 라이브러리
+    디스패치가 없어 레코드가 많을 때 xlsxwriter보다도 빠르다.
+    """
+    def row_xml(r: int, values) -> str:
+        cells = "".join(
+            f'<c t="inlineStr"><is><t>{escape(str(v))}</t></is></c>' for v in values
+        )
+        return f'<row r="{r}">{cells}</row>'
+
+    rows = [row_xml(1, columns.keys())]  # 헤더 행
+    for r, values in enumerate(zip(*columns.values()), start=2):
+        rows.append(row_xml(r, values))
+    sheet = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        f"<sheetData>{''.join(rows)}</sheetData></worksheet>"
+    )
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _XLSX_CONTENT_TYPES)
+        zf.writestr("_rels/.rels", _XLSX_RELS)
+        zf.writestr("xl/workbook.xml", _XLSX_WORKBOOK)
+        zf.writestr("xl/_rels/workbook.xml.rels", _XLSX_WORKBOOK_RELS)
+        zf.writestr("xl/worksheets/sheet1.xml", sheet)
+
+# Q4 2025 기간 패턴을 하나의 alternation으로 합쳐 모듈 로드 시 1회만 컴파일
+# (페이지마다 6개 패턴을 각각 검색하는 대신 한 번만 스캔)
+Q4_2025_RE = re.compile(
+    r"Q4\s*2025"
+    r"|(?:31|30)\s*Dec(?:ember)?\s*2025"
+    r"|Dec(?:ember)?\s*(?:31|30),?\s*2025"
+    r"|12[/\-]31[/\-]2025"
+    r"|2025[/\-]12[/\-]31"
+    r"|Portfolio\s+date[:\s]+.*2025[/\-]12",
+    re.IGNORECASE,
+)
+
+# 종목 링크의 sym= 파라미터 / "Stock Name - TKR" 형식 티커 패턴
+SYM_RE = re.compile(r"[?&]sym=([A-Z.]+)", re.IGNORECASE)
+TICKER_RE = re.compile(r"[-–]\s*([A-Z]{1,5})\b")
+# 동시 요청 수 제한 (사이트 부하 방지)
+CONCURRENCY = 8
+
+# 요청당 고정 간격 — 세마포어가 동시성을 이미 제한하므로 랜덤 지연이 불필요
+# (실효 요청률은 초당 CONCURRENCY / REQUEST_SPACING 이하로 유지됨)
+REQUEST_SPACING = 0.25
+
+# 일시적 오류에 대한 재시도 설정
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 0.5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# 받은 HTML을 디스크에 캐시해서 개발 중 재실행 시 네트워크를 건너뜀
+CACHE_DIR = Path("dataroma_cache")
+CACHE_TTL = 6 * 3600  # 6시간
+
+
+def _cache_path(url: str) -> Path:
+    return CACHE_DIR / (hashlib.sha1(url.encode()).hexdigest() + ".html")
+
+
+def _cache_get(url: str) -> bytes | None:
+    """캐시된 HTML이 있고 TTL 이내면 반환한다."""
+    path = _cache_path(url)
+    try:
+        if time.time() - path.stat().st_mtime < CACHE_TTL:
+            return path.read_bytes()
+    except OSError:
+        pass
+    return None
 
 
-def fetch_page(url: str, session: requests.Session) -> BeautifulSoup | None:
-    """URL을 요청하고 BeautifulSoup 객체를 반환한다."""
+def _cache_put(url: str, body: bytes) -> None:
     try:
-        resp = session.get(url, headers=HEADERS, timeout=30)
-        resp.raise_for_status()
-        return BeautifulSoup(resp.text, "html.parser")
-    except requests.RequestException as e:
-        print(f"  [ERROR] 요청 실패: {url} -> {e}")
-        return None
+        CACHE_DIR.mkdir(exist_ok=True)
+        _cache_path(url).write_bytes(body)
+    except OSError:
+        pass  # 캐시 실패는 치명적이지 않음
+
 
+async def fetch_raw(url: str, session: aiohttp.ClientSession) -> bytes | None:
+    """URL을 요청하고 응답 본문을 bytes로 반환한다.
 
-def get_manager_links(session: requests.Session) -> list[dict]:
+    캐시 히트 시 네트워크 요청과 politeness 지연을 모두 건너뛴다.
+    429/5xx 등 일시적 오류는 지수 백오프로 최대 RETRY_TOTAL회 재시도한다.
+    """
+    cached = _cache_get(url)
+    if cached is not None:
+        return cached
+
+    # 실제 요청 전에만 고정 간격 대기 (캐시 히트는 대기 없음)
+    await asyncio.sleep(REQUEST_SPACING)
+
+    last_err: object = None
+    for attempt in range(RETRY_TOTAL + 1):
+        if attempt:
+            await asyncio.sleep(RETRY_BACKOFF * (2 ** (attempt - 1)))
+        try:
+            async with session.get(url, headers=HEADERS) as resp:
+                if resp.status in RETRY_STATUSES:
+                    last_err = f"HTTP {resp.status}"
+                    continue
+                resp.raise_for_status()
+                body = await resp.read()
+                _cache_put(url, body)
+                return body
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            last_err = e
+            if isinstance(e, aiohttp.ClientResponseError):
+                break  # 404 등 재시도해도 소용없는 응답
+            continue
+
+    print(f"  [ERROR] 요청 실패: {url} -> {last_err}")
+    return None
+
+
+async def get_manager_links(session: aiohttp.ClientSession) -> list[dict]:
     """managers.php 페이지에서 구루 이름과 상세 페이지 URL을 수집한다."""
     print("=" * 60)
     print("1단계: Manager 리스트 수집 중...")
     print("=" * 60)
 
-    soup = fetch_page(MANAGERS_URL, session)
-    if soup is None:
+    body = await fetch_raw(MANAGERS_URL, session)
+    if body is None:
         print("[FATAL] 매니저 리스트 페이지를 불러올 수 없습니다.")
         sys.exit(1)
 
-    managers = []
+    try:
+        doc = lxml_html.fromstring(body)
+    except Exception as e:
+        print(f"[FATAL] 매니저 리스트 페이지를 파싱할 수 없습니다: {e}")
+        sys.exit(1)
 
     # managers.php 는 #port_body 안에 <a> 링크로 구루 목록이 있음
     # 링크 형식: /m/holdings.php?m=XXX
-    for link in soup.select("a[href*='holdings.php?m=']"):
-        href = link.get("href", "")
-        name = link.get_text(strip=True)
+    # XPath로 바로 추출 + URL 기준 중복 제거 (같은 URL이 여러 번 나올 수 있음)
+    seen = set()
+    unique = []
+    for link in doc.xpath("//a[contains(@href, 'holdings.php?m=')]"):
+        href = link.get("href") or ""
+        name = " ".join(link.text_content().split())
         if not href or not name:
             continue
         full_url = BASE_URL + href if href.startswith("/") else href
-        managers.append({"name": name, "url": full_url})
-
-    # 중복 제거 (같은 URL이 여러 번 나올 수 있음)
-    seen = set()
-    unique = []
-    for m in managers:
-        if m["url"] not in seen:
-            seen.add(m["url"])
-            unique.append(m)
+        if full_url in seen:
+            continue
+        seen.add(full_url)
+        unique.append({"name": name, "url": full_url})
 
     print(f"  -> 총 {len(unique)}명의 매니저를 발견했습니다.\n")
     return unique
 
 
-def is_q4_2025(soup: BeautifulSoup) -> bool:
-    """페이지에 Q4 2025 (또는 2025-12-31 / Dec 2025 등) 데이터가 있는지 확인한다."""
-    # 페이지 상단 텍스트에서 기간 정보를 찾음
-    # 가능한 패턴: "Q4 2025", "Period: Q4 2025", "Portfolio date: 31 Dec 2025",
-    #              "12/31/2025", "2025-12-31" 등
-    page_text = soup.get_text(" ", strip=True)
-
-    patterns = [
-        r"Q4\s*2025",
-        r"(?:31|30)\s*Dec(?:ember)?\s*2025",
-        r"Dec(?:ember)?\s*(?:31|30),?\s*2025",
-        r"12[/\-]31[/\-]2025",
-        r"2025[/\-]12[/\-]31",
-        r"Portfolio\s+date[:\s]+.*2025[/\-]12",
-    ]
-
-    for pattern in patterns:
-        if re.search(pattern, page_text, re.IGNORECASE):
-            return True
-    return False
-
+@functools.lru_cache(maxsize=8)
+def _detect_cols(headers: tuple[str, ...]) -> dict[str, int]:
+    """소문자 헤더 텍스트 튜플에서 컬럼 인덱스 매핑을 만든다.
 
-def parse_holdings(soup: BeautifulSoup, manager_name: str) -> list[dict]:
+    Dataroma의 테이블 스키마는 모든 매니저 페이지에서 동일하므로
+    헤더 튜플을 키로 캐시해 페이지마다 재탐지하지 않는다.
     """
-    보유 종목 테이블(#grid)을 파싱하여
-    Recent Activity가 Buy 또는 Add인 종목만 반환한다.
-    """
-    results = []
-
-    table = soup.find("table", id="grid")
-    if table is None:
-        # id가 grid가 아닐 수 있으므로 다른 방법으로 시도
-        table = soup.find("table", class_="holdings")
-        if table is None:
-            # 모든 테이블에서 "Stock" 헤더가 있는 것을 찾기
-            for t in soup.find_all("table"):
-                header_text = t.get_text(" ", strip=True)[:200]
-                if "Stock" in header_text and "Activity" in header_text:
-                    table = t
-                    break
-
-    if table is None:
-        print(f"    [WARN] {manager_name}: 보유종목 테이블을 찾지 못했습니다.")
-        return results
-
-    # 헤더 행에서 컬럼 인덱스를 파악
-    header_row = table.find("tr")
-    if header_row is None:
-        return results
-
-    headers = []
-    for th in header_row.find_all(["th", "td"]):
-        headers.append(th.get_text(" ", strip=True).lower())
-
-    # 컬럼 인덱스 매핑
     col_map = {}
     for i, h in enumerate(headers):
         if "stock" in h:
@@ -144,14 +266,84 @@ def parse_holdings(soup: BeautifulSoup, manager_name: str) -> list[dict]:
             col_map["price"] = i
         elif "price" in h and "price" not in col_map:
             col_map["price"] = i
+    return col_map
 
-    # 데이터 행 순회
-    rows = table.find_all("tr")[1:]  # 헤더 제외
+
+def extract_records(doc: lxml_html.HtmlElement, manager_name: str,
+                    columns: dict[str, list]) -> int | None:
+    """
+    기간 확인과 보유종목 추출을 한 번의 트리 순회로 처리한다.
+
+    먼저 페이지가 Q4 2025인지 확인하고, 아니면 None을 반환해 테이블 파싱을
+    건너뛴다. 맞으면 보유 종목 테이블(#grid)에서 Recent Activity가 Buy 또는
+    Add인 종목을 columns(컬럼 단위 리스트)에 추가하고, 추가한 행 수를 반환한다.
+    """
+    # 기간 정보는 항상 페이지 상단(제목/헤더/기간 표시)에 있으므로
+    # DOM 전체를 문자열로 직렬화하지 않고 해당 영역만 추출해서 검사
+    # 가능한 패턴: "Q4 2025", "Period: Q4 2025", "Portfolio date: 31 Dec 2025",
+    #              "12/31/2025", "2025-12-31" 등
+    header_els = doc.xpath(
+        "//title | //h1 | //h2 | //*[@id='port_body']//span"
+        " | //*[contains(@class, 'period')]"
+    )
+    page_text = " ".join(el.text_content() for el in header_els)[:4096]
+    if not Q4_2025_RE.search(page_text):
+        # 상단 영역에서 못 찾았을 때만 전체 텍스트로 폴백 (드문 페이지 구조 대비)
+        if not Q4_2025_RE.search(doc.text_content()):
+            return None
+
+    count = 0
+
+    tables = doc.xpath("//table[@id='grid']")
+    if not tables:
+        # id가 grid가 아닐 수 있으므로 다른 방법으로 시도
+        tables = doc.xpath("//table[contains(@class, 'holdings')]")
+    table = tables[0] if tables else None
+    if table is None:
+        # 모든 테이블에서 "Stock" 헤더가 있는 것을 찾기
+        for t in doc.iter("table"):
+            header_text = " ".join(t.text_content().split())[:200]
+            if "Stock" in header_text and "Activity" in header_text:
+                table = t
+                break
+
+    if table is None:
+        print(f"    [WARN] {manager_name}: 보유종목 테이블을 찾지 못했습니다.")
+        return count
+
+    # 헤더 행에서 컬럼 인덱스를 파악
+    header_row = table.find(".//tr")
+    if header_row is None:
+        return count
+
+    headers = tuple(
+        " ".join(th.text_content().split()).lower()
+        for th in header_row.xpath("th|td")
+    )
+    col_map = _detect_cols(headers)
+
+    # Buy/Add 텍스트가 있는 행만 XPath(C 수준)로 먼저 선별
+    # -> 파이썬 루프가 방문하는 행 수가 전체 보유종목에서 매수 종목 수로 줄어듦
+    # (헤더 행은 Buy/Add 셀이 없어 자연히 제외됨. 정확한 필터링은 아래
+    #  activity 컬럼 검사가 계속 담당)
+    rows = table.xpath(".//tr[td[contains(., 'Buy') or contains(., 'Add')]]")
     for row in rows:
-        cells = row.find_all("td")
+        cells = row.findall("td")
         if len(cells) < 3:
             continue
 
+        # Recent Activity를 먼저 확인 — 대부분의 행은 Hold/Reduce/Sell이므로
+        # 비싼 종목명/티커/가격 추출 전에 싼 필터로 걸러냄
+        activity_idx = col_map.get("activity", 4)
+        activity_text = ""
+        if activity_idx < len(cells):
+            activity_text = cells[activity_idx].text_content().strip()
+
+        # Buy 또는 Add인 경우만 필터
+        activity_lower = activity_text.lower()
+        if not ("buy" in activity_lower or "add" in activity_lower):
+            continue
+
         # 종목명과 티커 추출
         stock_text = ""
         ticker = ""
@@ -161,109 +353,143 @@ def parse_holdings(soup: BeautifulSoup, manager_name: str) -> list[dict]:
             stock_cell = cells[stock_idx]
             # 티커는 보통 링크 안에 있거나 별도 span에 있음
             # 또는 "Stock Name - TKR" 형식
-            stock_text = stock_cell.get_text(" ", strip=True)
+            stock_text = " ".join(stock_cell.text_content().split())
             # 링크에서 티커 추출 시도
-            stock_link = stock_cell.find("a")
-            if stock_link:
-                stock_text = stock_link.get_text(" ", strip=True)
+            stock_link = stock_cell.find(".//a")
+            if stock_link is not None:
+                stock_text = " ".join(stock_link.text_content().split())
                 # href에서 sym= 파라미터로 티커 추출
-                link_href = stock_link.get("href", "")
-                sym_match = re.search(r"[?&]sym=([A-Z.]+)", link_href, re.IGNORECASE)
+                link_href = stock_link.get("href") or ""
+                sym_match = SYM_RE.search(link_href)
                 if sym_match:
                     ticker = sym_match.group(1).upper()
 
         # 티커를 텍스트에서 추출 시도 (괄호 안이나 대시 뒤)
         if not ticker:
-            ticker_match = re.search(r"[-–]\s*([A-Z]{1,5})\b", stock_text)
+            ticker_match = TICKER_RE.search(stock_text)
             if ticker_match:
                 ticker = ticker_match.group(1)
 
-        # Recent Activity 확인
-        activity_idx = col_map.get("activity", 4)
-        activity_text = ""
-        if activity_idx < len(cells):
-            activity_text = cells[activity_idx].get_text(" ", strip=True)
-
-        # Buy 또는 Add인 경우만 필터
-        activity_lower = activity_text.lower()
-        if not ("buy" in activity_lower or "add" in activity_lower):
-            continue
-
         # Portfolio %
         pct_text = ""
         pct_idx = col_map.get("portfolio_pct", 2)
         if pct_idx < len(cells):
-            pct_text = cells[pct_idx].get_text(" ", strip=True)
+            pct_text = cells[pct_idx].text_content().strip()
 
         # Price
         price_text = ""
         price_idx = col_map.get("price", 5)
         if price_idx < len(cells):
-            price_text = cells[price_idx].get_text(" ", strip=True)
+            price_text = cells[price_idx].text_content().strip()
 
-        results.append({
-            "Manager": manager_name,
-            "Stock": stock_text.strip(),
-            "Ticker": ticker,
-            "Recent Activity": activity_text,
-            "Portfolio %": pct_text,
-            "Reported Price": price_text,
-        })
+        columns["Manager"].append(manager_name)
+        columns["Stock"].append(stock_text.strip())
+        columns["Ticker"].append(ticker)
+        columns["Recent Activity"].append(activity_text)
+        columns["Portfolio %"].append(pct_text)
+        columns["Reported Price"].append(price_text)
+        count += 1
 
-    return results
+    return count
 
 
-def main():
-    print()
-    print("*" * 60)
-    print("  Dataroma Q4 2025 Buy/Add 포트폴리오 스크래퍼")
-    print("*" * 60)
-    print()
+def _parse_one(body: bytes, name: str) -> tuple[str, dict[str, list] | None]:
+    """워커 프로세스에서 실행: HTML 파싱 + Q4 2025 필터 + Buy/Add 추출.
 
-    session = requests.Session()
-    session.headers.update(HEADERS)
+    반환값: (상태, 페이지별 컬럼 dict). 상태는 "q4" / "skip" / "error".
+    """
+    # lxml 트리로 직접 파싱 (libxml2가 깨진 HTML도 복구해서 파싱함)
+    try:
+        doc = lxml_html.fromstring(body)
+    except Exception:
+        return "error", None
 
-    # 1) 매니저 리스트 수집
-    managers = get_manager_links(session)
-    if not managers:
-        print("[FATAL] 매니저를 찾을 수 없습니다. 종료합니다.")
-        sys.exit(1)
+    # 기간 확인과 테이블 파싱을 한 함수에서 처리 (트리를 한 번만 순회)
+    page_columns = new_result_columns()
+    if extract_records(doc, name, page_columns) is None:
+        return "skip", None
+    return "q4", page_columns
 
-    # 2) 개별 페이지 순회
-    print("=" * 60)
-    print("2단계: 개별 매니저 페이지 순회 (Q4 2025 필터링)")
-    print("=" * 60)
 
-    all_records = []
-    q4_count = 0
-    skip_count = 0
+async def process_manager(mgr: dict, session: aiohttp.ClientSession,
+                          semaphore: asyncio.Semaphore, pool: ProcessPoolExecutor,
+                          columns: dict[str, list]) -> str:
+    """매니저 한 명의 페이지를 받아 Q4 2025 Buy/Add 종목을 columns에 추가한다.
 
-    for i, mgr in enumerate(managers, 1):
-        name = mgr["name"]
-        url = mgr["url"]
-        print(f"  [{i}/{len(managers)}] {name} 확인 중...", end=" ")
+    반환값: "q4" / "skip" / "error" 중 하나의 상태.
+    """
+    name = mgr["name"]
 
-        time.sleep(random.uniform(1, 3))
+    # 세마포어로 동시 요청 수를 제한 (요청 간 지연은 fetch_raw가 캐시 미스 시에만 수행)
+    async with semaphore:
+        body = await fetch_raw(mgr["url"], session)
 
-        soup = fetch_page(url, session)
-        if soup is None:
-            print("-> ERROR (요청 실패)")
-            continue
+    if body is None:
+        print(f"  [{name}] -> ERROR (요청 실패)")
+        return "error"
 
-        if not is_q4_2025(soup):
-            print("-> Skip (Q4 2025 아님)")
-            skip_count += 1
-            continue
+    # CPU 작업(파싱/추출)은 워커 프로세스로 보내 GIL 바깥에서 병렬 처리
+    loop = asyncio.get_running_loop()
+    status, page_columns = await loop.run_in_executor(pool, _parse_one, body, name)
 
-        # Q4 2025 데이터 확인 -> Buy/Add 종목 추출
-        records = parse_holdings(soup, name)
-        if records:
-            all_records.extend(records)
-            print(f"-> Found! ({len(records)}개 Buy/Add 종목)")
-            q4_count += 1
+    if status == "error":
+        print(f"  [{name}] -> ERROR (파싱 실패)")
+    elif status == "skip":
+        print(f"  [{name}] -> Skip (Q4 2025 아님)")
+    else:
+        # 워커가 만든 페이지별 결과를 공유 컬럼에 병합 (이벤트 루프 스레드라 안전)
+        count = len(page_columns["Manager"])
+        for col, values in page_columns.items():
+            columns[col].extend(values)
+        if count:
+            print(f"  [{name}] -> Found! ({count}개 Buy/Add 종목)")
         else:
-            print("-> Q4 2025이지만 Buy/Add 종목 없음")
-            q4_count += 1
+            print(f"  [{name}] -> Q4 2025이지만 Buy/Add 종목 없음")
+    return status
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Dataroma Q4 2025 Buy/Add 스크래퍼")
+    parser.add_argument("--excel", action="store_true",
+                        help=f"CSV 외에 엑셀 파일({OUTPUT_XLSX})도 저장")
+    parser.add_argument("--raw-excel", action="store_true",
+                        help="엑셀 파일을 라이브러리 없이 직접 생성 (레코드가 많을 때 더 빠름)")
+    args = parser.parse_args()
+
+    print()
+    print("*" * 60)
+    print("  Dataroma Q4 2025 Buy/Add 포트폴리오 스크래퍼")
+    print("*" * 60)
+    print()
+
+    # keep-alive 커넥션 풀을 공유하는 단일 세션
+    connector = aiohttp.TCPConnector(limit=CONCURRENCY, limit_per_host=CONCURRENCY)
+    timeout = aiohttp.ClientTimeout(total=30)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                     headers=HEADERS) as session:
+        # 1) 매니저 리스트 수집
+        managers = await get_manager_links(session)
+        if not managers:
+            print("[FATAL] 매니저를 찾을 수 없습니다. 종료합니다.")
+            sys.exit(1)
+
+        # 2) 개별 페이지 동시 처리
+        print("=" * 60)
+        print(f"2단계: 매니저 페이지 동시 수집 (Q4 2025 필터링, 동시 {CONCURRENCY}개)")
+        print("=" * 60)
+
+        semaphore = asyncio.Semaphore(CONCURRENCY)
+        columns = new_result_columns()
+        # 네트워크는 이벤트 루프, 파싱은 프로세스 풀에서 코어 수만큼 병렬로
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+            statuses = await asyncio.gather(
+                *(process_manager(mgr, session, semaphore, pool, columns)
+                  for mgr in managers)
+            )
+
+    q4_count = statuses.count("q4")
+    skip_count = statuses.count("skip")
+    total_records = len(columns["Manager"])
 
     # 3) 결과 요약 및 엑셀 저장
     print()
@@ -272,23 +498,34 @@ def main():
     print("=" * 60)
     print(f"  - Q4 2025 매니저 수: {q4_count}")
     print(f"  - Skip된 매니저 수: {skip_count}")
-    print(f"  - 총 Buy/Add 레코드 수: {len(all_records)}")
-
-    if all_records:
-        df = pd.DataFrame(all_records)
-        # 컬럼 순서 정렬
-        columns = ["Manager", "Stock", "Ticker", "Recent Activity",
-                    "Portfolio %", "Reported Price"]
-        df = df[[c for c in columns if c in df.columns]]
-
-        df.to_excel(OUTPUT_FILE, index=False, sheet_name="Q4 2025 Buys")
-        print(f"\n  -> 결과가 '{OUTPUT_FILE}'에 저장되었습니다!")
+    print(f"  - 총 Buy/Add 레코드 수: {total_records}")
+
+    if total_records:
+        # 컬럼 단위 dict라 추론 없이 바로 DataFrame 생성, 순서도 그대로 유지됨
+        df = pd.DataFrame(columns)
+
+        df.to_csv(OUTPUT_CSV, index=False)
+        print(f"\n  -> 결과가 '{OUTPUT_CSV}'에 저장되었습니다!")
+
+        if args.raw_excel:
+            # 셀 단위 라이브러리 디스패치 없이 XLSX XML을 직접 생성
+            _write_xlsx_raw(columns, OUTPUT_XLSX)
+            print(f"  -> 엑셀 파일도 '{OUTPUT_XLSX}'에 저장되었습니다!")
+        elif args.excel:
+            # xlsxwriter 엔진이 기본 openpyxl보다 쓰기 속도가 훨씬 빠름
+            # constant_memory: 행 단위로 바로 플러시 -> 레코드가 늘어도 메모리 일정
+            with pd.ExcelWriter(
+                OUTPUT_XLSX, engine="xlsxwriter",
+                engine_kwargs={"options": {"constant_memory": True}},
+            ) as writer:
+                df.to_excel(writer, index=False, sheet_name="Q4 2025 Buys")
+            print(f"  -> 엑셀 파일도 '{OUTPUT_XLSX}'에 저장되었습니다!")
     else:
-        print("\n  -> 조건에 맞는 데이터가 없습니다. 엑셀 파일을 생성하지 않습니다.")
+        print("\n  -> 조건에 맞는 데이터가 없습니다. 결과 파일을 생성하지 않습니다.")
 
     print()
     print("완료!")
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())